@@ -1,8 +1,13 @@
-from flask import Flask, render_template
+from flask import Flask, render_template, send_file
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 from datetime import datetime, timedelta
+from dateutil.tz import tzlocal
 import json
+import time
+import orjson
 from pathlib import Path
 import googlemaps
 
@@ -11,26 +16,59 @@ app = Flask(__name__)
 # Berkeley's center coordinates as fallback
 BERKELEY_CENTER = {"lat": 37.8719, "lng": -122.2585}
 
-def geocode_address(address):
-    """Geocode an address using cached results or return Berkeley center coordinates."""
+# Shared by the waitress request threads so repeated ArcGIS fetches reuse TLS connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=1)
+))
+
+# Static map written by test.py's build_map(), outside the request path
+MAP_FILE = Path("berkeley_crime_analysis.html")
+
+# In-process cache of the last ArcGIS fetch, keyed by the date window
+CRIME_CACHE_TTL = 300  # seconds
+_CRIME_CACHE = {"ts": 0, "key": None, "crimes": None, "etag": None}
+
+def _load_geocode_cache():
     cache_file = Path("geocode_cache.json")
     if cache_file.exists():
         with open(cache_file, "r") as f:
-            geocode_cache = json.load(f)
-    else:
-        geocode_cache = {}
+            return json.load(f)
+    return {}
 
-    if address in geocode_cache:
-        return geocode_cache[address]
+# Loaded once at import so lookups are a dict hit rather than a file parse
+geocode_cache = _load_geocode_cache()
 
-    # If no API key is set, return Berkeley center coordinates
-    return BERKELEY_CENTER
+def geocode_address(address):
+    """Geocode an address using cached results or return Berkeley center coordinates."""
+    # If no API key is set, fall back to Berkeley center coordinates
+    return geocode_cache.get(address, BERKELEY_CENTER)
 
 def fetch_crime_data():
-    # Get data for the last 30 days
+    """Return crimes for the last 30 days, served from memory for CRIME_CACHE_TTL seconds."""
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30)
-    
+
+    # Keying on the window means a day rollover invalidates the cache
+    key = (start_date.date(), end_date.date())
+    now = time.monotonic()
+    if _CRIME_CACHE["key"] == key and now - _CRIME_CACHE["ts"] < CRIME_CACHE_TTL:
+        return _CRIME_CACHE["crimes"]
+
+    # Revalidate with the stored ETag so an unchanged dataset costs a bodyless 304
+    etag = _CRIME_CACHE["etag"] if _CRIME_CACHE["key"] == key else None
+    crimes, etag = _query_crime_data(start_date, end_date, etag)
+    if crimes is None:
+        _CRIME_CACHE["ts"] = now
+        return _CRIME_CACHE["crimes"]
+    if crimes:
+        _CRIME_CACHE.update(ts=now, key=key, crimes=crimes, etag=etag)
+    return crimes
+
+def _query_crime_data(start_date, end_date, etag=None):
+    """Query ArcGIS and return (crimes, etag); crimes is None when the server answers 304."""
     base_url = "https://services7.arcgis.com/vIHhVXjE1ToSg0Fz/arcgis/rest/services/Berkeley_PD_Cases_2016_to_Current/FeatureServer/0/query"
     where_clause = (
         f"Occurred_Datetime >= DATE '{start_date.strftime('%Y-%m-%d')} 00:00:00' "
@@ -44,38 +82,44 @@ def fetch_crime_data():
         "f": "json"
     }
 
+    headers = {"If-None-Match": etag} if etag else {}
+
     try:
-        response = requests.get(base_url, params=params)
+        response = SESSION.get(base_url, params=params, headers=headers, timeout=15)
+        if response.status_code == 304:
+            return None, etag
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         features = data.get("features", [])
-        
-        if not features:
-            return []
-            
-        crimes = []
-        for feature in features:
-            attributes = feature.get("attributes", {})
-            if attributes:
-                # Convert timestamp to readable format
-                if "Occurred_Datetime" in attributes:
-                    timestamp = attributes["Occurred_Datetime"]
-                    if timestamp:
-                        attributes["Occurred_Datetime"] = datetime.fromtimestamp(timestamp/1000).strftime('%Y-%m-%d %H:%M')
-                
-                # Add coordinates if address is available
-                if "Block_Address" in attributes and attributes["Block_Address"]:
-                    coords = geocode_address(attributes["Block_Address"])
-                    if coords:
-                        attributes["latitude"] = coords["lat"]
-                        attributes["longitude"] = coords["lng"]
-                
-                crimes.append(attributes)
-        
-        return crimes
+
+        records = [feature["attributes"] for feature in features if feature.get("attributes")]
+        if not records:
+            return [], None
+
+        df = pd.DataFrame(records)
+
+        # Convert timestamps to readable local time in one vectorized pass
+        if "Occurred_Datetime" in df:
+            df["Occurred_Datetime"] = (
+                pd.to_datetime(df["Occurred_Datetime"], unit="ms", utc=True)
+                .dt.tz_convert(tzlocal())
+                .dt.strftime('%Y-%m-%d %H:%M')
+            )
+
+        # Geocode each distinct address once and join the coordinates back
+        if "Block_Address" in df:
+            coords = {
+                address: geocode_address(address)
+                for address in df["Block_Address"].dropna().unique() if address
+            }
+            df["latitude"] = df["Block_Address"].map({a: c["lat"] for a, c in coords.items()})
+            df["longitude"] = df["Block_Address"].map({a: c["lng"] for a, c in coords.items()})
+
+        crimes = df.astype(object).where(df.notna(), None).to_dict("records")
+        return crimes, response.headers.get("ETag")
     except Exception as e:
         print(f"Error fetching crime data: {str(e)}")
-        return []
+        return [], None
 
 @app.route('/')
 def index():
@@ -89,5 +133,11 @@ def crime_detail(crime_id):
         return render_template('crime_detail.html', crime=crimes[crime_id])
     return "Crime not found", 404
 
+@app.route('/map')
+def crime_map():
+    if MAP_FILE.exists():
+        return send_file(MAP_FILE.resolve())
+    return "Map not generated yet", 404
+
 if __name__ == '__main__':
     app.run(host='localhost', port=8000, debug=True)
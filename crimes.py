@@ -1,8 +1,10 @@
 import json
+import os
 import pandas as pd
 import geopandas as gpd
+import shapely
 import folium
-from folium.plugins import MarkerCluster, HeatMap
+from folium.plugins import FastMarkerCluster, HeatMap
 from shapely.geometry import Polygon
 import numpy as np
 from branca.colormap import LinearColormap
@@ -17,14 +19,39 @@ class CrimeDataLoader:
             self.cache = json.load(f)
             
         self.df = pd.read_csv('cached_crime_data.csv')
-        self.df[['lat', 'lon']] = self.df['Block_Address'].apply(
-            lambda x: pd.Series(self.cache.get(f"{x}, Berkeley, CA", (None, None)))
-        )
+        # Repeated strings become int codes; lookups below run per category
+        for col in ('Block_Address', 'Incident_Type', 'Statute_Type'):
+            if col in self.df:
+                self.df[col] = self.df[col].astype('category')
+
+        # Split the cache into parallel lat/lon dicts so the join is a C-level map
+        lat_map = {k: v[0] for k, v in self.cache.items() if v}
+        lon_map = {k: v[1] for k, v in self.cache.items() if v}
+        addresses = self.df['Block_Address'].cat
+        keys = addresses.categories + ", Berkeley, CA"
+        codes = addresses.codes.to_numpy()
+        # Code -1 marks a missing address and takes the NaN fill value
+        self.df['lat'] = keys.map(lat_map).take(codes, fill_value=np.nan).to_numpy()
+        self.df['lon'] = keys.map(lon_map).take(codes, fill_value=np.nan).to_numpy()
         self.df = self.df.dropna().drop_duplicates(subset=['lat', 'lon'])
+
+        # Build crime geometries once and share them across every render step
+        self.points = shapely.points(self.df['lon'].to_numpy(), self.df['lat'].to_numpy())
         
         # Load street data with proper CRS
-        self.streets = gpd.read_file('berkeley_streets.gpkg')
-        self.streets = self.streets.to_crs(epsg=4326)
+        self.streets = self._load_streets()
+        self.street_tree = shapely.STRtree(self.streets.geometry.values, node_capacity=16)
+
+    def _load_streets(self, source='berkeley_streets.gpkg', cache='berkeley_streets.pkl'):
+        """Load reprojected streets from a pickle, rebuilding it when the GeoPackage is newer"""
+        if os.path.exists(cache) and (
+            not os.path.exists(source) or os.path.getmtime(cache) >= os.path.getmtime(source)
+        ):
+            return pd.read_pickle(cache)
+
+        streets = gpd.read_file(source).to_crs(epsg=4326)
+        streets.to_pickle(cache, protocol=5)
+        return streets
 
 # ========================================================================
 # 2. UPDATED VISUALIZATION SYSTEM WITH HEATMAP
@@ -50,25 +77,22 @@ class CrimeVisualizer:
         )
         
         self.street_layer = folium.FeatureGroup(name='Street View')
-        self.marker_cluster = MarkerCluster().add_to(self.map)
 
     def create_street_heatmap(self):
         """Create street-level visualization"""
-        # Spatial join between crimes and streets
-        crime_points = gpd.GeoDataFrame(
-            self.data.df,
-            geometry=gpd.points_from_xy(self.data.df.lon, self.data.df.lat)
+        # Snap each crime to its nearest street in one bulk STRtree query
+        _, street_idx = self.data.street_tree.query_nearest(self.data.points, all_matches=False)
+        # Counts ride along as a feature property so the style function can read them
+        streets = self.data.streets.assign(
+            crime_count=np.bincount(street_idx, minlength=len(self.data.streets))
         )
         
-        joined = gpd.sjoin(crime_points, self.data.streets, predicate='within')
-        crime_counts = joined.groupby('index_right').size()
-        
         # Add street layer
         folium.GeoJson(
-            self.data.streets,
+            streets,
             style_function=lambda feature: {
-                'color': self.area_colormap(crime_counts.get(feature.id, 0)),
-                'weight': 3 + (crime_counts.get(feature.id, 0) ** 0.5),
+                'color': self.area_colormap(feature['properties']['crime_count']),
+                'weight': 3 + (feature['properties']['crime_count'] ** 0.5),
                 'opacity': 0.7
             },
             name='Street Crime Density'
@@ -82,14 +106,15 @@ class CrimeVisualizer:
 
     def add_markers(self):
         """Add crime markers"""
-        for _, row in self.data.df.iterrows():
-            folium.CircleMarker(
-                location=[row['lat'], row['lon']],
-                radius=3,
-                color='black',
-                fill=True,
-                fill_opacity=0.6
-            ).add_to(self.marker_cluster)
+        # Markers are built client-side from one coordinate array, not one element per row
+        FastMarkerCluster(
+            self.data.df[['lat', 'lon']].to_numpy().tolist(),
+            callback="""function (row) {
+                return L.circleMarker(new L.LatLng(row[0], row[1]), {
+                    radius: 3, color: 'black', fill: true, fillOpacity: 0.6
+                });
+            }"""
+        ).add_to(self.map)
 
     def render(self):
         self.create_street_heatmap()
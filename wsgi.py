@@ -1,4 +1,8 @@
+from waitress import serve
+
 from app import app
 
+# Production entry point; the Flask dev server in app.py is for local debugging.
+# Under gunicorn instead: gunicorn -w 4 -k gthread --threads 8 wsgi:app
 if __name__ == "__main__":
-    app.run(host='localhost', port=8000) 
\ No newline at end of file
+    serve(app, host='localhost', port=8000, threads=16)